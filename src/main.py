@@ -1,32 +1,161 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from pathlib import Path
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+# Cached frames are shared between reruns; copy-on-write keeps derived frames
+# from writing through to them
+pd.set_option("mode.copy_on_write", True)
+
 # Configuration
 DB_PATH = "data.db"
-DATA_COLUMNS = ['Date', 'NAV', 'Vni', 'NAV_index', 'Vni_index']
+READER_POOL_SIZE = 4
+DATE_FORMAT = "%Y-%m-%d"
+AMOUNT_COLUMNS = ['Date', 'MH', 'TA', 'AT', 'Total']
+DATA_COLUMNS = ['Date', 'NAV', 'Vni']
+INDEX_COLUMNS = ['NAV_index', 'Vni_index']
+TABLE_COLUMNS = {"Amount": AMOUNT_COLUMNS, "Data": DATA_COLUMNS}
+# Value dtypes used when building frames from raw rows. Older versions stored
+# AT and Total as INTEGER, so NumPy infers those to keep whole amounts integral
+TABLE_DTYPES = {
+    "Amount": {'MH': 'float64', 'TA': 'float64', 'AT': None, 'Total': None},
+    "Data": {'NAV': 'float64', 'Vni': 'float64'},
+}
 
-def init_database():
-    Path(DB_PATH).touch()
+def build_statements(table_name, columns):
+    """SQL text for one table, built once so SQLite's statement cache keeps hitting"""
+    column_list = ", ".join(f'"{col}"' for col in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    value_columns = ", ".join(f'"{col}" REAL' for col in columns[1:])
+    updates = ", ".join(f'"{col}"=excluded."{col}"' for col in columns[1:])
+    return {
+        "schema": f'CREATE TABLE IF NOT EXISTS "{table_name}" ("Date" TEXT PRIMARY KEY, {value_columns});',
+        "select": f'SELECT {column_list} FROM "{table_name}" ORDER BY Date',
+        "upsert": (
+            f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders}) '
+            f'ON CONFLICT(Date) DO UPDATE SET {updates}'
+        ),
+        "delete": f'DELETE FROM "{table_name}" WHERE Date = ?',
+    }
+
+SQL = {table_name: build_statements(table_name, columns) for table_name, columns in TABLE_COLUMNS.items()}
+
+def open_connection(read_only=False):
+    """Open a connection tuned for WAL, so reads never block the writer"""
+    mode = "ro" if read_only else "rwc"
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode={mode}", uri=True, check_same_thread=False)
+    if not read_only:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=memory")
+    conn.execute("PRAGMA cache_size=-64000")
+    return conn
+
+@st.cache_resource
+def writer():
+    """Single read-write connection shared by every session"""
+    return open_connection()
+
+@st.cache_resource
+def write_lock():
+    return threading.Lock()
 
-def execute_query(query, params=None):
+@st.cache_resource
+def readers():
+    """Pool of read-only connections that keep their page caches across reruns"""
+    pool = queue.Queue()
+    for _ in range(READER_POOL_SIZE):
+        pool.put(open_connection(read_only=True))
+    return pool
+
+@contextmanager
+def reader():
+    pool = readers()
+    conn = pool.get()
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            return pd.read_sql(query, conn, params=params)
-    except sqlite3.Error as e:
-        st.error(f"Database error: {e}")
-        return None
+        yield conn
+    finally:
+        pool.put(conn)
+
+def to_sql_date(value):
+    """Format a date-like value as the ISO text used for the Date key"""
+    return pd.Timestamp(value).strftime(DATE_FORMAT)
+
+def migrate_legacy_table(conn, table_name):
+    """Key a table written by older versions via to_sql on a normalized Date
+
+    Returns the dates that had several rows, of which only the latest was kept.
+    """
+    # Older versions stored timestamps and had no key, so normalize Date first
+    conn.execute(f'UPDATE "{table_name}" SET Date = substr(Date, 1, 10)')
+    duplicates = [date for (date,) in conn.execute(
+        f'SELECT Date FROM "{table_name}" GROUP BY Date HAVING COUNT(*) > 1'
+    )]
+    if duplicates:
+        conn.execute(
+            f'DELETE FROM "{table_name}" WHERE rowid NOT IN '
+            f'(SELECT MAX(rowid) FROM "{table_name}" GROUP BY Date)'
+        )
+    # Indices are derived on read, drop the copies older versions stored
+    stored = {info[1] for info in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    for col in INDEX_COLUMNS:
+        if col in stored:
+            conn.execute(f'ALTER TABLE "{table_name}" DROP COLUMN "{col}"')
+    return duplicates
+
+def date_is_keyed(conn, table_name):
+    """Whether Date already has a unique index, either its primary key or a migrated one"""
+    for _, index_name, unique, *_ in conn.execute(f'PRAGMA index_list("{table_name}")'):
+        columns = [info[2] for info in conn.execute(f'PRAGMA index_info("{index_name}")')]
+        if unique and columns == ['Date']:
+            return True
+    return False
+
+@st.cache_resource
+def init_database():
+    """Create the tables once per process, keyed on Date
+
+    Returns the dates whose duplicate rows the legacy migration collapsed, by table.
+    """
+    # Errors propagate so a failed setup is retried on the next run; main() reports them
+    # and shows the collapsed dates, since elements emitted here would replay on every hit
+    collapsed = {}
+    with write_lock(), writer() as conn:
+        existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master")}
+        legacy = [
+            table_name for table_name in TABLE_COLUMNS
+            if table_name in existing and not date_is_keyed(conn, table_name)
+        ]
+        if legacy:
+            conn.execute("BEGIN")
+            for table_name in legacy:
+                duplicates = migrate_legacy_table(conn, table_name)
+                if duplicates:
+                    collapsed[table_name] = duplicates
+                conn.execute(
+                    f'CREATE UNIQUE INDEX "{table_name}_Date" ON "{table_name}" (Date)'
+                )
+            conn.commit()
+        conn.executescript("".join(statements["schema"] for statements in SQL.values()))
+        for table_name in TABLE_COLUMNS:
+            # Earlier builds also indexed a primary-key Date, doubling the work of every write
+            primary_key = [info[1] for info in conn.execute(f'PRAGMA table_info("{table_name}")') if info[5]]
+            if primary_key == ['Date']:
+                conn.execute(f'DROP INDEX IF EXISTS "{table_name}_Date"')
+    return collapsed
 
-def save_to_sqlite(df, table_name):
+def upsert_row(row, table_name):
+    """Insert a single row, or update it in place if its Date already exists"""
+    values = (to_sql_date(row['Date']), *(row[col] for col in TABLE_COLUMNS[table_name][1:]))
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            df.to_sql(table_name, conn, if_exists="replace", index=False)
+        with write_lock(), writer() as conn:
+            conn.execute(SQL[table_name]["upsert"], values)
+        fetch_all.clear()
         return True
     except sqlite3.Error as e:
         st.error(f"Error saving to database: {e}")
@@ -34,47 +163,119 @@ def save_to_sqlite(df, table_name):
 
 def delete_entry(date, table_name):
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f'DELETE FROM "{table_name}" WHERE Date = ?', (date,))
-            conn.commit()
+        with write_lock(), writer() as conn:
+            conn.execute(SQL[table_name]["delete"], (to_sql_date(date),))
+        fetch_all.clear()
         return True
     except sqlite3.Error as e:
         st.error(f"Error deleting entry: {e}")
         return False
 
-def fetch_from_sqlite(table_name):
-    return execute_query(f'SELECT * FROM "{table_name}"')
+@st.cache_data(ttl=600)
+def database_exists():
+    return os.path.exists(DB_PATH)
+
+def fetch_from_sqlite(conn, table_name):
+    # Parse and sort by Date once here so the editors and charts receive
+    # datetimes in ascending order. The schema is fixed, so each column is
+    # built straight from the raw rows with its TABLE_DTYPES entry
+    columns = TABLE_COLUMNS[table_name]
+    rows = conn.execute(SQL[table_name]["select"]).fetchall()
+    values = dict(zip(columns, zip(*rows))) if rows else dict.fromkeys(columns, ())
+    return pd.DataFrame({
+        'Date': np.array(values['Date'], dtype='datetime64[ns]'),
+        **{col: np.array(values[col], dtype=dtype) for col, dtype in TABLE_DTYPES[table_name].items()}
+    })
+
+# Cached as a resource so reruns share the frames instead of unpickling a copy
+# each time; callers must not modify them in place
+@st.cache_resource(ttl=600)
+def fetch_all():
+    """Load every table through one pooled connection, so switching datasets is free"""
+    # Errors propagate so a failed read is never cached; main() reports them
+    with reader() as conn:
+        return {table_name: fetch_from_sqlite(conn, table_name) for table_name in TABLE_COLUMNS}
+
+def date_mask(df, date):
+    """Boolean mask of the rows falling on the given calendar day"""
+    return df['Date'].to_numpy().astype('datetime64[D]') == np.datetime64(date.date())
+
+def rebase(values, base):
+    """Express values as an index of 100 at base, or 0 when base is 0"""
+    return values / base * 100 if base != 0 else values * 0
+
+def frame_fingerprint(df):
+    """Cheap content hash used to key cached results on a DataFrame"""
+    return len(df), int(pd.util.hash_pandas_object(df, index=False).sum())
+
+# Keyed on content, so every write adds an entry; keep only the latest few
+@st.cache_resource(max_entries=2, hash_funcs={pd.DataFrame: frame_fingerprint})
+def with_indices(df):
+    """Derive NAV and VNI indices, rebased to 100 at the first entry"""
+    if df is None or df.empty:
+        return df
+    nav = df['NAV'].to_numpy(dtype=float)
+    vni = df['Vni'].to_numpy(dtype=float)
+    return df.assign(NAV_index=rebase(nav, nav[0]), Vni_index=rebase(vni, vni[0]))
+
+def finish_edit(table_name, message):
+    """Reset an editor's widgets and queue a message for the rerun that follows"""
+    for col in TABLE_COLUMNS[table_name]:
+        st.session_state.pop(f"{table_name}_{col}", None)
+    st.session_state[f"{table_name}_message"] = message
+
+def show_edit_message(table_name):
+    message = st.session_state.pop(f"{table_name}_message", None)
+    if message:
+        st.success(message)
+
+# Button callbacks run before the script reruns, so the widgets come back
+# already reset instead of one interaction later
+def save_amount():
+    state = st.session_state
+    mh, ta, at = state.Amount_MH, state.Amount_TA, state.Amount_AT
+    new_data = {
+        'Date': state.Amount_Date,
+        'MH': mh,
+        'TA': ta,
+        'AT': at,
+        'Total': mh + ta + at
+    }
+    if upsert_row(new_data, "Amount"):
+        finish_edit("Amount", "Data saved successfully!")
+
+def save_data():
+    state = st.session_state
+    new_data = {
+        'Date': state.Data_Date,
+        'NAV': state.Data_NAV,
+        'Vni': state.Data_Vni
+    }
+    if upsert_row(new_data, "Data"):
+        finish_edit("Data", "Data saved successfully!")
+
+def delete_selected(table_name):
+    if delete_entry(st.session_state[f"{table_name}_Date"], table_name):
+        finish_edit(table_name, "Entry deleted successfully!")
 
 def display_amount_editor(df):
     """Create a simplified editor for Amount table with date picker and auto-calculated total"""
     st.subheader("Amount Editor")
     
-    # Initialize session state for resetting
-    if 'reset_amount' not in st.session_state:
-        st.session_state.reset_amount = False
-    
     # Initialize DataFrame if None
     if df is None:
-        df = pd.DataFrame(columns=['Date', 'MH', 'TA', 'AT', 'Total'])
-    else:
-        # Create a copy of the DataFrame to avoid warnings
-        df = df.copy()
+        df = pd.DataFrame(columns=AMOUNT_COLUMNS).astype({'Date': 'datetime64[ns]'})
     
-    # Convert Date to datetime if it's not already
-    df['Date'] = pd.to_datetime(df['Date'])
+    show_edit_message("Amount")
     
     # Date picker for search/entry
-    if st.session_state.reset_amount:
-        selected_date = st.date_input("Select Date", datetime.now().date(), key='reset_date_amount')
-        st.session_state.reset_amount = False
-    else:
-        selected_date = st.date_input("Select Date", datetime.now().date())
+    selected_date = st.date_input("Select Date", datetime.now().date(), key="Amount_Date")
     
     # Check if data exists for selected date
     selected_date = pd.to_datetime(selected_date)
-    mask = df['Date'].dt.date == selected_date.date()
-    existing_data = df.loc[mask].iloc[0] if len(df[mask]) > 0 else None
+    mask = date_mask(df, selected_date)
+    matches = np.flatnonzero(mask)
+    existing_data = df.iloc[matches[0]] if matches.size else None
     
     # Input fields
     col1, col2, col3, col4 = st.columns(4)
@@ -82,25 +283,25 @@ def display_amount_editor(df):
     with col1:
         mh_value = st.number_input(
             "MH",
-            value=float(existing_data['MH']) if existing_data is not None and not st.session_state.reset_amount else 0.0,
+            value=float(existing_data['MH']) if existing_data is not None else 0.0,
             format="%.2f",
-            key=f"mh_{st.session_state.reset_amount}"
+            key="Amount_MH"
         )
     
     with col2:
         ta_value = st.number_input(
             "TA",
-            value=float(existing_data['TA']) if existing_data is not None and not st.session_state.reset_amount else 0.0,
+            value=float(existing_data['TA']) if existing_data is not None else 0.0,
             format="%.2f",
-            key=f"ta_{st.session_state.reset_amount}"
+            key="Amount_TA"
         )
     
     with col3:
         at_value = st.number_input(
             "AT",
-            value=float(existing_data['AT']) if existing_data is not None and not st.session_state.reset_amount else 0.0,
+            value=float(existing_data['AT']) if existing_data is not None else 0.0,
             format="%.2f",
-            key=f"at_{st.session_state.reset_amount}"
+            key="Amount_AT"
         )
     
     with col4:
@@ -110,43 +311,20 @@ def display_amount_editor(df):
     # Save and Delete buttons in the same row
     col1, col2 = st.columns(2)
     with col1:
-        save_clicked = st.button("Save Amount Data", type="primary")
+        st.button("Save Amount Data", type="primary", on_click=save_amount)
     with col2:
-        delete_clicked = st.button("Delete Entry", type="secondary")
-    
-    if save_clicked:
-        new_data = {
-            'Date': selected_date,
-            'MH': mh_value,
-            'TA': ta_value,
-            'AT': at_value,
-            'Total': total
-        }
-        
-        if existing_data is not None:
-            df.loc[mask] = new_data
-        else:
-            df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-        
-        if save_to_sqlite(df, "Amount"):
-            st.success("Data saved successfully!")
-            st.session_state.reset_amount = True
-            st.experimental_rerun()
-    
-    if delete_clicked and existing_data is not None:
-        if delete_entry(selected_date, "Amount"):
-            st.success("Entry deleted successfully!")
-            df = df[~mask]  # Using boolean indexing instead of equality
-            save_to_sqlite(df, "Amount")
-            st.session_state.reset_amount = True
-            st.experimental_rerun()
+        st.button(
+            "Delete Entry",
+            type="secondary",
+            on_click=delete_selected,
+            args=("Amount",),
+            disabled=existing_data is None
+        )
     
     # Display full table
     if not df.empty:
         st.subheader("Amount Table")
-        display_df = df.copy()
-        display_df['Date'] = display_df['Date'].dt.date
-        st.dataframe(display_df.sort_values('Date', ascending=False))
+        st.dataframe(df.assign(Date=df['Date'].dt.date).iloc[::-1])
     
     return df
 
@@ -154,31 +332,20 @@ def display_data_editor(df):
     """Create a simplified editor for Data table with date picker and auto-calculated indices"""
     st.subheader("Data Editor")
     
-    # Initialize session state for resetting
-    if 'reset_data' not in st.session_state:
-        st.session_state.reset_data = False
-    
     # Initialize DataFrame if None
     if df is None:
-        df = pd.DataFrame(columns=['Date', 'NAV', 'Vni', 'NAV_index', 'Vni_index'])
-    else:
-        # Create a copy of the DataFrame to avoid warnings
-        df = df.copy()
+        df = pd.DataFrame(columns=DATA_COLUMNS).astype({'Date': 'datetime64[ns]'})
     
-    # Convert Date to datetime if it's not already
-    df['Date'] = pd.to_datetime(df['Date'])
+    show_edit_message("Data")
     
     # Date picker for search/entry
-    if st.session_state.reset_data:
-        selected_date = st.date_input("Select Date", datetime.now().date(), key='reset_date_data')
-        st.session_state.reset_data = False
-    else:
-        selected_date = st.date_input("Select Date", datetime.now().date())
+    selected_date = st.date_input("Select Date", datetime.now().date(), key="Data_Date")
     
     # Check if data exists for selected date
     selected_date = pd.to_datetime(selected_date)
-    mask = df['Date'].dt.date == selected_date.date()
-    existing_data = df.loc[mask].iloc[0] if len(df[mask]) > 0 else None
+    mask = date_mask(df, selected_date)
+    matches = np.flatnonzero(mask)
+    existing_data = df.iloc[matches[0]] if matches.size else None
     
     # Input fields
     col1, col2, col3, col4 = st.columns(4)
@@ -186,25 +353,25 @@ def display_data_editor(df):
     with col1:
         nav_value = st.number_input(
             "NAV",
-            value=float(existing_data['NAV']) if existing_data is not None and not st.session_state.reset_data else 0.0,
+            value=float(existing_data['NAV']) if existing_data is not None else 0.0,
             format="%.2f",
-            key=f"nav_{st.session_state.reset_data}"
+            key="Data_NAV"
         )
     
     with col2:
         vni_value = st.number_input(
             "VNI",
-            value=float(existing_data['Vni']) if existing_data is not None and not st.session_state.reset_data else 0.0,
+            value=float(existing_data['Vni']) if existing_data is not None else 0.0,
             format="%.2f",
-            key=f"vni_{st.session_state.reset_data}"
+            key="Data_Vni"
         )
     
     # Calculate indices
     if not df.empty and len(df) > 0:
-        first_nav = df.iloc[0]['NAV']
-        first_vni = df.iloc[0]['Vni']
-        nav_index = (nav_value / first_nav * 100) if first_nav != 0 else 0
-        vni_index = (vni_value / first_vni * 100) if first_vni != 0 else 0
+        first_nav = df['NAV'].iat[0]
+        first_vni = df['Vni'].iat[0]
+        nav_index = rebase(nav_value, first_nav)
+        vni_index = rebase(vni_value, first_vni)
     else:
         nav_index = 100
         vni_index = 100
@@ -218,71 +385,41 @@ def display_data_editor(df):
     # Save and Delete buttons in the same row
     col1, col2 = st.columns(2)
     with col1:
-        save_clicked = st.button("Save Data", type="primary")
+        st.button("Save Data", type="primary", on_click=save_data)
     with col2:
-        delete_clicked = st.button("Delete Entry", type="secondary")
-    
-    if save_clicked:
-        new_data = {
-            'Date': selected_date,
-            'NAV': nav_value,
-            'Vni': vni_value,
-            'NAV_index': nav_index,
-            'Vni_index': vni_index
-        }
-        
-        if existing_data is not None:
-            df.loc[mask] = new_data
-        else:
-            df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-        
-        # Recalculate all indices based on the first entry
-        if len(df) > 0:
-            first_nav = df.iloc[0]['NAV']
-            first_vni = df.iloc[0]['Vni']
-            df['NAV_index'] = (df['NAV'] / first_nav * 100)
-            df['Vni_index'] = (df['Vni'] / first_vni * 100)
-        
-        if save_to_sqlite(df, "Data"):
-            st.success("Data saved successfully!")
-            st.session_state.reset_data = True
-            st.experimental_rerun()
-    
-    if delete_clicked and existing_data is not None:
-        if delete_entry(selected_date, "Data"):
-            st.success("Entry deleted successfully!")
-            df = df[~mask]  # Using boolean indexing instead of equality
-            
-            # Recalculate indices after deletion
-            if not df.empty:
-                first_nav = df.iloc[0]['NAV']
-                first_vni = df.iloc[0]['Vni']
-                df['NAV_index'] = (df['NAV'] / first_nav * 100)
-                df['Vni_index'] = (df['Vni'] / first_vni * 100)
-            
-            save_to_sqlite(df, "Data")
-            st.session_state.reset_data = True
-            st.experimental_rerun()
+        st.button(
+            "Delete Entry",
+            type="secondary",
+            on_click=delete_selected,
+            args=("Data",),
+            disabled=existing_data is None
+        )
     
     # Display full table
     if not df.empty:
         st.subheader("Data Table")
-        display_df = df.copy()
-        display_df['Date'] = display_df['Date'].dt.date
-        st.dataframe(display_df.sort_values('Date', ascending=False))
+        st.dataframe(df.assign(Date=df['Date'].dt.date).iloc[::-1])
     
     return df
 
+def format_labels(values, fmt, scale=1):
+    """Format a column as text labels, scaling it with one array division"""
+    return [fmt % x for x in (values.to_numpy(dtype=float) / scale).tolist()]
+
+# Two recent figures per table are enough to cover switching datasets. Shared
+# rather than pickled on every hit, so callers must not modify the figure.
+@st.cache_resource(max_entries=4, hash_funcs={pd.DataFrame: frame_fingerprint})
 def create_visualization(df, selected_table):
+    # Plotly is heavy to import. st.plotly_chart imports it anyway whenever a chart is
+    # shown, so deferring it only helps runs with nothing to plot, such as an empty table
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     try:
         if df is None or df.empty:
             return None
             
         if selected_table == "Amount":
-            # Convert Date to datetime if it's not already
-            df['Date'] = pd.to_datetime(df['Date'])
-            # Sort by date
-            df = df.sort_values('Date')
             
             # Create bar chart for Amount
             fig = go.Figure()
@@ -297,7 +434,7 @@ def create_visualization(df, selected_table):
                         name=col,
                         x=x_numeric,
                         y=df[col],
-                        text=[f'{x/1000000:.1f}M' for x in df[col]],
+                        text=format_labels(df[col], '%.1fM', 1e6),
                         textposition='auto',
                         width=0.3,  # Increased overall width for the group
                         offset=(-0.15 + (0.15* i)),  # Position bars side by side within the group
@@ -311,7 +448,7 @@ def create_visualization(df, selected_table):
                     x=x_numeric,
                     y=df['Total'],
                     mode='lines+markers+text',
-                    text=[f'{x/1000000000:.1f}B' for x in df['Total']],
+                    text=format_labels(df['Total'], '%.1fB', 1e9),
                     textposition='top center',
                     line=dict(color='red', width=2),
                     marker=dict(size=8),
@@ -344,10 +481,6 @@ def create_visualization(df, selected_table):
             return fig
             
         else:  # Data table
-            # Convert Date to datetime if it's not already
-            df['Date'] = pd.to_datetime(df['Date'])
-            # Sort by date
-            df = df.sort_values('Date')
             
             # Create two subplots
             fig = make_subplots(
@@ -364,7 +497,7 @@ def create_visualization(df, selected_table):
                     y=df['NAV_index'],
                     name="NAV Index",
                     mode='lines',
-                    text=[f'{x:.1f}%' for x in df['NAV_index']],
+                    text=format_labels(df['NAV_index'], '%.1f%%'),
                     textposition='top center'
                 ),
                 row=1, col=1
@@ -375,7 +508,7 @@ def create_visualization(df, selected_table):
                     y=df['Vni_index'],
                     name="VNI Index",
                     mode='lines',
-                    text=[f'{x:.1f}%' for x in df['Vni_index']],
+                    text=format_labels(df['Vni_index'], '%.1f%%'),
                     textposition='bottom center'
                 ),
                 row=1, col=1
@@ -388,7 +521,7 @@ def create_visualization(df, selected_table):
                     y=df['NAV'],
                     name="NAV",
                     mode='lines',
-                    text=[f'{x:.1f}' for x in df['NAV']],
+                    text=format_labels(df['NAV'], '%.1f'),
                     textposition='top center'
                 ),
                 row=2, col=1
@@ -422,7 +555,18 @@ def main():
     """Main application logic"""
     st.set_page_config(page_title="VN Account Tracker", layout="wide")
     
-    init_database()
+    try:
+        collapsed = init_database()
+    except sqlite3.Error as e:
+        st.error(f"Error initializing database: {e}")
+        collapsed = {}
+    if collapsed and not st.session_state.get("migration_notice_shown"):
+        st.session_state["migration_notice_shown"] = True
+        for table_name, dates in collapsed.items():
+            st.warning(
+                f"{table_name} had several rows for {', '.join(dates)}; "
+                "only the most recently written row for each date was kept."
+            )
     
     with st.sidebar:
         st.title("Dashboard Controls")
@@ -437,12 +581,16 @@ def main():
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        if os.path.exists(DB_PATH):
-            df = fetch_from_sqlite(selected_table)
+        if database_exists():
+            try:
+                df = fetch_all()[selected_table]
+            except sqlite3.Error as e:
+                st.error(f"Database error: {e}")
+                df = None
             if selected_table == "Amount":
                 df = display_amount_editor(df)
             else:
-                df = display_data_editor(df)
+                df = display_data_editor(with_indices(df))
         else:
             st.warning("Database not found. Please create a new entry to initialize the database.")
     
@@ -1,2 +1,141 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import main
+
+# Tables as the original to_sql-based version wrote them
+LEGACY_SCHEMA = '''
+CREATE TABLE "Amount" ("Date" TIMESTAMP, "MH" REAL, "TA" REAL, "AT" INTEGER, "Total" INTEGER);
+CREATE TABLE "Data" ("Date" DATE, "NAV" REAL, "Vni" REAL, "NAV_index" REAL, "Vni_index" REAL);
+INSERT INTO "Amount" VALUES ('2021-03-08 00:00:00', 150000000.0, 1121963199.0, 0, 1271963199);
+INSERT INTO "Amount" VALUES ('2021-11-15 00:00:00', 177892128.0, 1567107872.0, 0, 1745000000);
+INSERT INTO "Data" VALUES ('2020-01-08', 1548096000.0, 948.98, 100.0, 100.0);
+INSERT INTO "Data" VALUES ('2020-01-09', 1549429000.0, 960.15, 100.086, 101.177);
+'''
+
+CACHED = (
+    main.writer, main.readers, main.write_lock, main.init_database,
+    main.fetch_all, main.with_indices,
+)
+
+
+def clear_caches():
+    for cached in CACHED:
+        cached.clear()
+
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    path = tmp_path / "data.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+    monkeypatch.setattr(main, "DB_PATH", str(path))
+    clear_caches()
+    yield path
+    clear_caches()
+
+
+def query(path, sql):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(sql).fetchall()
+
+
 def test_example():
     assert True
+
+
+def test_init_database_migrates_legacy_tables(legacy_db):
+    main.init_database()
+
+    assert query(legacy_db, 'SELECT Date FROM "Amount" ORDER BY Date') == [
+        ('2021-03-08',), ('2021-11-15',)
+    ]
+    assert [info[1] for info in query(legacy_db, 'PRAGMA table_info("Data")')] == main.DATA_COLUMNS
+    indexes = {name for (name,) in query(legacy_db, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"Amount_Date", "Data_Date"} <= indexes
+    assert query(legacy_db, 'SELECT * FROM "Data" ORDER BY Date')[0] == ('2020-01-08', 1548096000.0, 948.98)
+
+
+def test_init_database_keys_fresh_tables_once(tmp_path, monkeypatch):
+    path = tmp_path / "data.db"
+    monkeypatch.setattr(main, "DB_PATH", str(path))
+    clear_caches()
+
+    main.init_database()
+    main.init_database.clear()
+    main.init_database()
+
+    for table_name in main.TABLE_COLUMNS:
+        assert len(query(path, f'PRAGMA index_list("{table_name}")')) == 1
+    clear_caches()
+
+
+def test_init_database_keeps_latest_duplicate(legacy_db):
+    with sqlite3.connect(legacy_db) as conn:
+        conn.execute('''INSERT INTO "Amount" VALUES ('2021-03-08', 1.0, 2.0, 3, 6)''')
+
+    assert main.init_database() == {"Amount": ["2021-03-08"]}
+
+    assert query(legacy_db, '''SELECT * FROM "Amount" WHERE Date = '2021-03-08' ''') == [
+        ('2021-03-08', 1.0, 2.0, 3, 6)
+    ]
+
+
+def test_upsert_row_inserts_then_updates(legacy_db):
+    main.init_database()
+    row = {'Date': pd.Timestamp('2030-01-01'), 'NAV': 1.6e9, 'Vni': 1000.0}
+
+    assert main.upsert_row(row, "Data")
+    assert main.upsert_row({**row, 'Vni': 1001.0}, "Data")
+
+    data = main.fetch_all()["Data"]
+    assert len(data) == 3
+    assert data['Date'].iat[-1] == pd.Timestamp('2030-01-01')
+    assert data['Vni'].iat[-1] == 1001.0
+
+
+def test_delete_entry_accepts_timestamp(legacy_db):
+    main.init_database()
+
+    assert main.delete_entry(pd.Timestamp('2021-03-08'), "Amount")
+
+    assert query(legacy_db, 'SELECT Date FROM "Amount"') == [('2021-11-15',)]
+
+
+def test_with_indices_rebases_to_first_entry():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2020-01-08', '2020-01-09']),
+        'NAV': [200.0, 250.0],
+        'Vni': [1000.0, 900.0],
+    })
+
+    result = main.with_indices(df)
+
+    assert result['NAV_index'].tolist() == [100.0, 125.0]
+    assert result['Vni_index'].tolist() == [100.0, 90.0]
+
+
+def test_with_indices_handles_zero_first_value():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2020-01-08', '2020-01-09']),
+        'NAV': [0.0, 250.0],
+        'Vni': [1000.0, 900.0],
+    })
+
+    result = main.with_indices(df)
+
+    assert result['NAV_index'].tolist() == [0.0, 0.0]
+    assert np.isfinite(result['Vni_index']).all()
+
+
+def test_fetch_all_keeps_integer_amounts(legacy_db):
+    main.init_database()
+
+    amount = main.fetch_all()["Amount"]
+
+    assert amount['AT'].dtype == np.int64
+    assert amount['Total'].tolist() == [1271963199, 1745000000]
+    assert amount['MH'].dtype == np.float64